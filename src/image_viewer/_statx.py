@@ -0,0 +1,104 @@
+"""Linux ``statx(2)`` 的 ctypes 封装。
+
+``os.stat`` 与 ``os.DirEntry.stat`` 无法传入 ``AT_STATX_DONT_SYNC``。在 NFS/SMB 等远程文件系统上，每次 stat
+都可能触发一次与服务器的缓存校验往返；带上该标志后内核直接使用本地缓存的属性，目录遍历可因此显著加速，代价是
+元数据可能略有滞后。该模块只在 glibc 提供 ``statx`` 的 Linux 上可用，其他平台上 :func:`is_available` 返回
+``False``。
+"""
+
+from __future__ import annotations
+
+import ctypes
+import os
+import sys
+from typing import Callable, Optional, Tuple
+
+AT_FDCWD = -100
+AT_SYMLINK_NOFOLLOW = 0x100
+AT_STATX_DONT_SYNC = 0x4000
+
+STATX_TYPE = 0x1
+STATX_MODE = 0x2
+STATX_MTIME = 0x40
+STATX_SIZE = 0x200
+
+_MASK = STATX_TYPE | STATX_MODE | STATX_MTIME | STATX_SIZE
+
+
+class _StatxTimestamp(ctypes.Structure):
+    _fields_ = [
+        ("tv_sec", ctypes.c_int64),
+        ("tv_nsec", ctypes.c_uint32),
+        ("_reserved", ctypes.c_int32),
+    ]
+
+
+class _Statx(ctypes.Structure):
+    _fields_ = [
+        ("stx_mask", ctypes.c_uint32),
+        ("stx_blksize", ctypes.c_uint32),
+        ("stx_attributes", ctypes.c_uint64),
+        ("stx_nlink", ctypes.c_uint32),
+        ("stx_uid", ctypes.c_uint32),
+        ("stx_gid", ctypes.c_uint32),
+        ("stx_mode", ctypes.c_uint16),
+        ("_spare0", ctypes.c_uint16),
+        ("stx_ino", ctypes.c_uint64),
+        ("stx_size", ctypes.c_uint64),
+        ("stx_blocks", ctypes.c_uint64),
+        ("stx_attributes_mask", ctypes.c_uint64),
+        ("stx_atime", _StatxTimestamp),
+        ("stx_btime", _StatxTimestamp),
+        ("stx_ctime", _StatxTimestamp),
+        ("stx_mtime", _StatxTimestamp),
+        ("stx_rdev_major", ctypes.c_uint32),
+        ("stx_rdev_minor", ctypes.c_uint32),
+        ("stx_dev_major", ctypes.c_uint32),
+        ("stx_dev_minor", ctypes.c_uint32),
+        ("_spare2", ctypes.c_uint64 * 14),
+    ]
+
+
+def _load() -> Optional[Callable[..., int]]:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        func = ctypes.CDLL(None, use_errno=True).statx
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_int,
+        ctypes.c_uint,
+        ctypes.POINTER(_Statx),
+    ]
+    func.restype = ctypes.c_int
+    return func
+
+
+_STATX = _load()
+
+
+def is_available() -> bool:
+    """当前平台是否支持 :func:`fast_stat`。"""
+
+    return _STATX is not None
+
+
+def fast_stat(path: str, *, follow_symlinks: bool) -> Tuple[int, int, float]:
+    """以 ``AT_STATX_DONT_SYNC`` 读取 ``path`` 的元数据。
+
+    返回 ``(st_mode, st_size, st_mtime)``，其中 ``st_mtime`` 与 ``os.stat`` 的浮点秒数保持一致。失败时抛出与
+    ``os.stat`` 相同类型的 :class:`OSError` 子类。
+    """
+
+    if _STATX is None:
+        raise OSError("statx is not available on this platform")
+    buf = _Statx()
+    flags = AT_STATX_DONT_SYNC if follow_symlinks else AT_STATX_DONT_SYNC | AT_SYMLINK_NOFOLLOW
+    if _STATX(AT_FDCWD, os.fsencode(path), flags, _MASK, ctypes.byref(buf)) != 0:
+        error = ctypes.get_errno()
+        raise OSError(error, os.strerror(error), path)
+    mtime = buf.stx_mtime
+    return buf.stx_mode, buf.stx_size, mtime.tv_sec + mtime.tv_nsec * 1e-9
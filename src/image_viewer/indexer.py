@@ -7,22 +7,76 @@
 from __future__ import annotations
 
 import argparse
+import json
 import logging
 import os
 import queue
 import re
 import sqlite3
+import stat
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from . import _statx
 
 LOGGER = logging.getLogger(__name__)
 
+# 写入 ``entries`` 表的一行：(path, parent, is_dir, size, mtime)。
+_EntryRow = Tuple[str, str, int, Optional[int], float]
 
-@dataclass(slots=True)
-class IndexEntry:
-    """索引中存储的单个文件或目录条目。"""
+_TOKEN_RE = re.compile(r"[0-9A-Za-z]+")
+
+
+@lru_cache(maxsize=65536)
+def _folder_name_tokens(folder_name: str) -> str:
+    """返回目录名中长度至少为 2 的小写关键词，编码为 JSON 数组供 ``json_each`` 使用。
+
+    媒体库中的目录名高度重复（``Season 1``、``2021`` 等），缓存分词结果可以让重复名称跳过正则匹配。
+    """
+
+    # 关键词顺序无关紧要：entry_tags 的主键决定了 B 树中的排列，这里无需排序。
+    tokens = {match.group(0).lower() for match in _TOKEN_RE.finditer(folder_name)}
+    return json.dumps([token for token in tokens if len(token) >= 2])
+
+# 数据库结构版本，记录在 ``PRAGMA user_version`` 中；低于该版本的索引会被丢弃并重建。
+_SCHEMA_VERSION = 2
+
+_DEFAULT_MIN_TAG_FREQUENCY = 2
+
+# 遍历期间观察到的条目先写入内存临时表，遍历结束后再一次性合并进 entries。
+_STAGE_SQL = """
+INSERT OR IGNORE INTO temp.new_entries(path, parent, is_dir, size, mtime)
+VALUES(?, ?, ?, ?, ?)
+"""
+
+# 未变化的行不会被改写，稳定媒体库的增量构建几乎不产生 WAL 页面。
+# ``WHERE true`` 用于消除 INSERT ... SELECT 与 ON CONFLICT 之间的语法歧义。
+_MERGE_SQL = """
+INSERT INTO entries(path, parent, is_dir, size, mtime)
+SELECT path, parent, is_dir, size, mtime FROM temp.new_entries WHERE true
+ON CONFLICT(path) DO UPDATE SET
+    parent = excluded.parent,
+    is_dir = excluded.is_dir,
+    size = excluded.size,
+    mtime = excluded.mtime
+WHERE entries.mtime != excluded.mtime
+    OR entries.size IS NOT excluded.size
+    OR entries.is_dir != excluded.is_dir
+"""
+
+# 遍历受 IO 延迟限制而非 CPU 限制，默认让至少这么多个目录扫描同时在途。
+_DEFAULT_IO_DEPTH = 32
+
+
+class IndexEntry(NamedTuple):
+    """索引中存储的单个文件或目录条目。
+
+    以具名元组实现，查询结果可以通过游标的 ``row_factory`` 直接构造，开销低于数据类实例。
+    """
 
     path: str
     parent: str
@@ -31,6 +85,11 @@ class IndexEntry:
     mtime: float
 
 
+def _index_entry_factory(cursor: sqlite3.Cursor, row: Tuple[str, str, int, Optional[int], float]) -> IndexEntry:
+    path, parent, is_dir, size, mtime = row
+    return IndexEntry(path, parent, is_dir == 1, size, mtime)
+
+
 @dataclass(slots=True)
 class TagSummary:
     """自动生成的目录标签概览。"""
@@ -51,6 +110,9 @@ class DirectoryIndexer:
         存储索引的 SQLite 数据库文件路径。
     follow_symlinks:
         是否在遍历时跟随符号链接。默认为 ``False``，以避免符号链接形成循环时产生无限递归。
+    fast_stat:
+        是否在 Linux 上改用带 ``AT_STATX_DONT_SYNC`` 的 ``statx`` 读取元数据。对 NFS/SMB 等远程文件系统可省去
+        缓存校验往返，但读到的元数据可能略有滞后。平台不支持时会记录警告并退回 ``os.scandir`` 的 stat。
     """
 
     def __init__(
@@ -59,23 +121,25 @@ class DirectoryIndexer:
         db_path: os.PathLike[str] | str,
         *,
         follow_symlinks: bool = False,
+        fast_stat: bool = False,
     ) -> None:
         self.root_path = Path(root_path).resolve()
         self.db_path = Path(db_path).resolve()
         self.follow_symlinks = follow_symlinks
-        wal = self.db_path.with_name(f"{self.db_path.name}-wal")
-        shm = self.db_path.with_name(f"{self.db_path.name}-shm")
-        self._ignored_files = {
-            self.db_path.resolve(),
-            wal.resolve(),
-            shm.resolve(),
-        }
-        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self._conn.execute("PRAGMA journal_mode=WAL")
-        self._conn.execute("PRAGMA synchronous=NORMAL")
-        self._conn.execute("PRAGMA temp_store=MEMORY")
-        self._conn.execute("PRAGMA locking_mode=NORMAL")
-        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._root_prefix = os.path.join(str(self.root_path), "")
+        self._fast_stat: Optional[Callable[..., Tuple[int, int, float]]] = None
+        if fast_stat:
+            if _statx.is_available():
+                self._fast_stat = _statx.fast_stat
+            else:
+                LOGGER.warning("当前平台不支持 statx，将使用常规 stat 读取元数据")
+        # 数据库及其 WAL/SHM 文件可能位于根目录内。扫描时每个目录只比较一次所在目录的路径字符串，
+        # 命中后再按文件名排除，无需在热循环中调用 resolve()。
+        # 经由被跟随的符号链接目录访问到的数据库不会被识别。
+        db_name = self.db_path.name
+        self._db_dir = str(self.db_path.parent)
+        self._ignored_names = frozenset({db_name, f"{db_name}-wal", f"{db_name}-shm"})
+        self._conn = self._connect()
         self._db_lock = threading.Lock()
         self._ensure_schema()
         LOGGER.debug("索引器已初始化：%s", self.root_path)
@@ -87,8 +151,8 @@ class DirectoryIndexer:
         self,
         *,
         max_workers: Optional[int] = None,
-        batch_size: int = 512,
-        min_tag_frequency: int = 2,
+        batch_size: int = 8192,
+        min_tag_frequency: int = _DEFAULT_MIN_TAG_FREQUENCY,
     ) -> None:
         """遍历文件系统并更新磁盘上的索引。
 
@@ -98,75 +162,113 @@ class DirectoryIndexer:
         Parameters
         ----------
         max_workers:
-            遍历目录时使用的工作线程数量。若未指定，则根据 ``os.cpu_count()`` 推导。
+            遍历目录时使用的工作线程数量。若未指定，则取 ``os.cpu_count()`` 与 32 中的较大值：线程在 stat 与
+            readdir 系统调用中会释放 GIL，更多线程意味着同时有更多 IO 请求在途。
         batch_size:
-            在批量写入 SQLite 之前缓冲的 :class:`IndexEntry` 条目数量。批量越大，提交开销越小，但内存占用越高。
+            在批量写入 SQLite 之前，每个工作线程缓冲的条目数量。整个构建在同一事务中完成，批量大小只影响单次写入调用的条目数与内存占用。
         """
 
-        max_workers = max_workers or max(os.cpu_count() or 1, 4)
+        max_workers = max_workers or max(os.cpu_count() or 1, _DEFAULT_IO_DEPTH)
         batch_size = max(batch_size, 32)
         min_tag_frequency = max(1, min_tag_frequency)
 
-        self._reset_seen_flags()
-        self._upsert_entries([self._create_root_entry()])
-
-        dir_queue: "queue.Queue[tuple[Path, str]]" = queue.Queue()
-        result_queue: "queue.Queue[Sequence[IndexEntry] | object]" = queue.Queue()
+        result_queue: "queue.SimpleQueue[List[_EntryRow] | object]" = queue.SimpleQueue()
         sentinel = object()
-
-        def worker() -> None:
-            while True:
-                item = dir_queue.get()
-                try:
-                    if item is sentinel:
-                        return
-                    abs_path, rel_path = item
-                    entries, sub_dirs = self._scan_directory(abs_path, rel_path)
-                    if entries:
-                        result_queue.put(entries)
-                    for child_abs, child_rel in sub_dirs:
-                        dir_queue.put((child_abs, child_rel))
-                finally:
-                    dir_queue.task_done()
+        cancelled = threading.Event()
+        crawl_done = threading.Event()
+        crawl_errors: List[BaseException] = []
+        pending_lock = threading.Lock()
+        pending = 0
+        # 每个工作线程只向自己的缓冲区追加条目，攒满一批后整体交给写线程，避免逐目录的队列往返。
+        buffers: Dict[int, List[_EntryRow]] = {}
+        crawl_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="indexer-scan")
+        write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="indexer-writer")
+
+        def submit(abs_path: str, rel_path: str) -> None:
+            nonlocal pending
+            with pending_lock:
+                pending += 1
+            crawl_pool.submit(scan, abs_path, rel_path)
+
+        def scan(abs_path: str, rel_path: str) -> None:
+            nonlocal pending
+            try:
+                if cancelled.is_set():
+                    return
+                entries, sub_dirs = self._scan_directory(abs_path, rel_path)
+                ident = threading.get_ident()
+                rows = buffers.setdefault(ident, [])
+                rows.extend(entries)
+                if len(rows) >= batch_size:
+                    buffers[ident] = []
+                    result_queue.put(rows)
+                for child_abs, child_rel in sub_dirs:
+                    submit(child_abs, child_rel)
+            except BaseException as error:
+                crawl_errors.append(error)
+                crawl_done.set()
+            finally:
+                with pending_lock:
+                    pending -= 1
+                    if pending == 0:
+                        crawl_done.set()
 
         def writer() -> None:
-            buffer: List[IndexEntry] = []
-            while True:
-                item = result_queue.get()
-                try:
+            # 写线程独占一个连接，工作线程从不接触 SQLite，因此写入路径无需加锁。
+            conn = self._connect()
+            # 构建期间关闭 fsync：进程崩溃只会丢失未提交的本次构建，但操作系统崩溃或断电可能损坏索引文件，
+            # 届时需要重新扫描。locking_mode 保持 NORMAL，因为读取连接始终打开着，WAL 数据库无法被独占锁定；
+            # BEGIN IMMEDIATE 已经保证构建期间只有这一个写入者。
+            conn.execute("PRAGMA synchronous=OFF")
+            # 允许 SQLite 在排序等操作中使用辅助线程；编译时未启用该功能时此设置无效。
+            conn.execute("PRAGMA threads=4")
+            # 所有批次复用同一个游标，语句只在首次执行时编译。
+            cursor = conn.cursor()
+            try:
+                # 整个构建过程（包括标签维护）只使用一个显式事务，避免每个批次各自提交并触发 fsync。
+                conn.execute("BEGIN IMMEDIATE")
+                self._create_staging_table(conn)
+                self._stage_entries(cursor, [self._create_root_entry()])
+                while True:
+                    item = result_queue.get()
                     if item is sentinel:
                         break
-                    buffer.extend(item)
-                    if len(buffer) >= batch_size:
-                        self._upsert_entries(buffer)
-                        buffer.clear()
-                finally:
-                    result_queue.task_done()
-            if buffer:
-                self._upsert_entries(buffer)
-
-        workers = [threading.Thread(target=worker, daemon=True) for _ in range(max_workers)]
-        for thread in workers:
-            thread.start()
-
-        writer_thread = threading.Thread(target=writer, daemon=True)
-        writer_thread.start()
-
-        dir_queue.put((self.root_path, "."))
-
-        dir_queue.join()
-        result_queue.join()
-
-        result_queue.put(sentinel)
-        writer_thread.join()
-
-        for _ in workers:
-            dir_queue.put(sentinel)
-        for thread in workers:
-            thread.join()
-
-        self._remove_unseen_entries()
-        self._rebuild_tags(min_tag_frequency=min_tag_frequency)
+                    if not cancelled.is_set():
+                        self._stage_entries(cursor, item)
+                if cancelled.is_set():
+                    return
+                self._merge_staged_entries(conn)
+                self._store_min_tag_frequency(conn, min_tag_frequency=min_tag_frequency)
+                conn.commit()
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.close()
+
+        writer_future = write_pool.submit(writer)
+        # 写线程提前失败时同样唤醒主线程，以便尽快中止遍历。
+        writer_future.add_done_callback(lambda _: crawl_done.set())
+        completed = False
+        try:
+            submit(str(self.root_path), ".")
+            crawl_done.wait()
+            if writer_future.done():
+                writer_future.result()
+            if crawl_errors:
+                raise crawl_errors[0]
+            for rows in buffers.values():
+                if rows:
+                    result_queue.put(rows)
+            completed = True
+        finally:
+            # 中断时先通知写线程放弃剩余批次并等待其回滚，再把异常交给调用方。
+            if not completed:
+                cancelled.set()
+            crawl_pool.shutdown(wait=completed, cancel_futures=True)
+            result_queue.put(sentinel)
+            write_pool.shutdown(wait=True)
+        writer_future.result()
         LOGGER.info("%s 的索引构建完成", self.root_path)
 
     def list_directory(self, relative_path: str = ".") -> List[IndexEntry]:
@@ -179,7 +281,9 @@ class DirectoryIndexer:
         """
 
         with self._db_lock:
-            cur = self._conn.execute(
+            cur = self._conn.cursor()
+            cur.row_factory = _index_entry_factory
+            cur.execute(
                 """
                 SELECT path, parent, is_dir, size, mtime
                 FROM entries
@@ -188,22 +292,22 @@ class DirectoryIndexer:
                 """,
                 (relative_path,),
             )
-            rows = cur.fetchall()
-        return [
-            IndexEntry(path=row[0], parent=row[1], is_dir=bool(row[2]), size=row[3], mtime=row[4])
-            for row in rows
-        ]
+            return cur.fetchall()
 
     def iter_all(self) -> Iterator[IndexEntry]:
-        """遍历索引中存储的所有条目。"""
+        """遍历索引中存储的所有条目。
+
+        结果逐行从游标中读取，不会一次性载入内存；锁只在执行查询时持有。
+        """
 
         with self._db_lock:
-            cur = self._conn.execute(
-                "SELECT path, parent, is_dir, size, mtime FROM entries ORDER BY path"
-            )
-            rows = cur.fetchall()
-        for row in rows:
-            yield IndexEntry(path=row[0], parent=row[1], is_dir=bool(row[2]), size=row[3], mtime=row[4])
+            cur = self._conn.cursor()
+            cur.row_factory = _index_entry_factory
+            cur.execute("SELECT path, parent, is_dir, size, mtime FROM entries ORDER BY path")
+        try:
+            yield from cur
+        finally:
+            cur.close()
 
     def list_tags(self) -> List[TagSummary]:
         """返回自动生成的标签及其匹配数量。"""
@@ -211,11 +315,9 @@ class DirectoryIndexer:
         with self._db_lock:
             cur = self._conn.execute(
                 """
-                SELECT tags.name, tags.display_name, COUNT(entry_tags.entry_path) as count
+                SELECT name, display_name, match_count
                 FROM tags
-                JOIN entry_tags ON entry_tags.tag_name = tags.name
-                GROUP BY tags.name, tags.display_name
-                ORDER BY count DESC, tags.display_name
+                ORDER BY match_count DESC, display_name
                 """
             )
             rows = cur.fetchall()
@@ -225,21 +327,19 @@ class DirectoryIndexer:
         """返回与指定标签匹配的目录。"""
 
         with self._db_lock:
-            cur = self._conn.execute(
+            cur = self._conn.cursor()
+            cur.row_factory = _index_entry_factory
+            cur.execute(
                 """
                 SELECT e.path, e.parent, e.is_dir, e.size, e.mtime
                 FROM entries e
                 JOIN entry_tags et ON et.entry_path = e.path
-                WHERE et.tag_name = ?
+                WHERE et.tag_name = ? AND EXISTS (SELECT 1 FROM tags WHERE tags.name = et.tag_name)
                 ORDER BY e.path
                 """,
                 (tag_name,),
             )
-            rows = cur.fetchall()
-        return [
-            IndexEntry(path=row[0], parent=row[1], is_dir=bool(row[2]), size=row[3], mtime=row[4])
-            for row in rows
-        ]
+            return cur.fetchall()
 
     def close(self) -> None:
         """关闭底层 SQLite 连接。"""
@@ -256,30 +356,45 @@ class DirectoryIndexer:
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # page_size 只对尚未创建任何表的新数据库生效，且必须在切换到 WAL 之前设置。
+        conn.execute("PRAGMA page_size=8192")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-262144")
+        conn.execute("PRAGMA mmap_size=1073741824")
+        conn.execute("PRAGMA locking_mode=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.create_function("folder_tokens", 1, self._folder_tokens, deterministic=True)
+        return conn
+
     def _ensure_schema(self) -> None:
         with self._db_lock:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < _SCHEMA_VERSION:
+                # 索引可以随时从文件系统重建，旧结构直接丢弃，下次 build_index 时重新填充。
+                self._conn.execute("DROP TABLE IF EXISTS entry_tags")
+                self._conn.execute("DROP TABLE IF EXISTS tags")
+                self._conn.execute("DROP TABLE IF EXISTS entries")
+            # 主键顺序与 list_directory 的查询条件和排序一致：按 parent 的一次 B 树查找即可按序返回完整行，
+            # 无需经过二级索引回表，也无需额外排序。
             self._conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS entries (
-                    path TEXT PRIMARY KEY,
-                    parent TEXT,
+                    parent TEXT NOT NULL,
+                    path TEXT NOT NULL,
                     is_dir INTEGER NOT NULL,
                     size INTEGER,
                     mtime REAL NOT NULL,
-                    seen INTEGER NOT NULL DEFAULT 0
-                )
+                    PRIMARY KEY (parent, is_dir DESC, path)
+                ) WITHOUT ROWID
                 """
             )
+            # upsert 的冲突检测与 entry_tags 的外键都需要 path 上的唯一约束。
             self._conn.execute(
-                "CREATE INDEX IF NOT EXISTS idx_entries_parent ON entries(parent)"
-            )
-            self._conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS tags (
-                    name TEXT PRIMARY KEY,
-                    display_name TEXT NOT NULL
-                )
-                """
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_path ON entries(path)"
             )
             self._conn.execute(
                 """
@@ -287,152 +402,162 @@ class DirectoryIndexer:
                     entry_path TEXT NOT NULL,
                     tag_name TEXT NOT NULL,
                     PRIMARY KEY (entry_path, tag_name),
-                    FOREIGN KEY (entry_path) REFERENCES entries(path) ON DELETE CASCADE,
-                    FOREIGN KEY (tag_name) REFERENCES tags(name) ON DELETE CASCADE
+                    FOREIGN KEY (entry_path) REFERENCES entries(path) ON DELETE CASCADE
                 )
                 """
             )
             self._conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_entry_tags_tag ON entry_tags(tag_name)"
             )
-
-    def _reset_seen_flags(self) -> None:
-        with self._db_lock:
-            self._conn.execute("UPDATE entries SET seen = 0")
-            self._conn.commit()
-
-    def _remove_unseen_entries(self) -> None:
-        with self._db_lock:
-            self._conn.execute("DELETE FROM entries WHERE seen = 0")
-            self._conn.commit()
-
-    def _upsert_entries(self, entries: Sequence[IndexEntry]) -> None:
-        if not entries:
-            return
-        rows = [
-            (
-                entry.path,
-                entry.parent,
-                1 if entry.is_dir else 0,
-                entry.size,
-                entry.mtime,
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value
+                )
+                """
             )
-            for entry in entries
-        ]
-        with self._db_lock:
-            self._conn.executemany(
+            # entry_tags 由触发器随 entries 的变化增量维护：只有新增或类型发生变化的目录才会被重新分词，
+            # 删除则由外键级联完成。触发器依赖连接上注册的 folder_tokens()，因此只能通过本类修改 entries。
+            self._conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS entries_tag_insert
+                AFTER INSERT ON entries
+                WHEN NEW.is_dir = 1 AND NEW.path != '.'
+                BEGIN
+                    INSERT OR IGNORE INTO entry_tags(entry_path, tag_name)
+                    SELECT NEW.path, value FROM json_each(folder_tokens(NEW.path));
+                END
                 """
-                INSERT INTO entries(path, parent, is_dir, size, mtime, seen)
-                VALUES(?, ?, ?, ?, ?, 1)
-                ON CONFLICT(path) DO UPDATE SET
-                    parent = excluded.parent,
-                    is_dir = excluded.is_dir,
-                    size = excluded.size,
-                    mtime = excluded.mtime,
-                    seen = 1
-                """,
-                rows,
             )
-            self._conn.commit()
+            self._conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS entries_tag_update
+                AFTER UPDATE OF is_dir ON entries
+                WHEN OLD.is_dir != NEW.is_dir
+                BEGIN
+                    DELETE FROM entry_tags WHERE entry_path = NEW.path;
+                    INSERT OR IGNORE INTO entry_tags(entry_path, tag_name)
+                    SELECT NEW.path, value FROM json_each(folder_tokens(NEW.path))
+                    WHERE NEW.is_dir = 1 AND NEW.path != '.';
+                END
+                """
+            )
+            # 标签本身是视图：匹配次数达到阈值的关键词才会出现。展示名在 SQL 中计算，纯字母的关键词首字母大写。
+            self._conn.execute(
+                f"""
+                CREATE VIEW IF NOT EXISTS tags AS
+                SELECT
+                    tag_name AS name,
+                    CASE
+                        WHEN tag_name GLOB '*[0-9]*' THEN tag_name
+                        ELSE upper(substr(tag_name, 1, 1)) || substr(tag_name, 2)
+                    END AS display_name,
+                    COUNT(*) AS match_count
+                FROM entry_tags
+                GROUP BY tag_name
+                HAVING COUNT(*) >= COALESCE(
+                    (SELECT value FROM settings WHERE key = 'min_tag_frequency'),
+                    {_DEFAULT_MIN_TAG_FREQUENCY}
+                )
+                """
+            )
+            self._conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+
+    def _create_staging_table(self, conn: sqlite3.Connection) -> None:
+        # 本次遍历的结果只暂存在内存临时表中，遍历期间不触碰 entries，也无需在构建开始时改写整张表。
+        conn.execute("DROP TABLE IF EXISTS temp.new_entries")
+        conn.execute(
+            """
+            CREATE TEMP TABLE new_entries (
+                path TEXT PRIMARY KEY,
+                parent TEXT NOT NULL,
+                is_dir INTEGER NOT NULL,
+                size INTEGER,
+                mtime REAL NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
 
-    def _create_root_entry(self) -> IndexEntry:
-        stat_info = self.root_path.stat()
-        return IndexEntry(path=".", parent="", is_dir=True, size=None, mtime=stat_info.st_mtime)
+    def _stage_entries(self, cursor: sqlite3.Cursor, rows: Sequence[_EntryRow]) -> None:
+        if not rows:
+            return
+        cursor.executemany(_STAGE_SQL, rows)
+
+    def _merge_staged_entries(self, conn: sqlite3.Connection) -> None:
+        conn.execute(_MERGE_SQL)
+        conn.execute("DELETE FROM entries WHERE path NOT IN (SELECT path FROM temp.new_entries)")
+        conn.execute("DROP TABLE temp.new_entries")
 
-    def _scan_directory(self, abs_path: Path, rel_path: str) -> Tuple[List[IndexEntry], List[Tuple[Path, str]]]:
-        entries: List[IndexEntry] = []
-        directories: List[Tuple[Path, str]] = []
+    def _create_root_entry(self) -> _EntryRow:
+        stat_info = self.root_path.stat()
+        return (".", "", 1, None, stat_info.st_mtime)
+
+    def _scan_directory(self, abs_path: str, rel_path: str) -> Tuple[List[_EntryRow], List[Tuple[str, str]]]:
+        # 热路径上直接生成可交给 executemany 的元组，不再为每个条目创建 IndexEntry。循环内用到的属性与
+        # 方法预先绑定到局部变量，子目录以字符串传递，避免逐条目的属性查找与 Path 构造。
+        entries: List[_EntryRow] = []
+        directories: List[Tuple[str, str]] = []
+        add_entry = entries.append
+        add_directory = directories.append
+        is_dir_mode = stat.S_ISDIR
+        follow_symlinks = self.follow_symlinks
+        fast_stat = self._fast_stat
+        ignored_names = self._ignored_names if abs_path == self._db_dir else frozenset()
+        child_prefix = "" if rel_path == "." else f"{rel_path}/"
         try:
             with os.scandir(abs_path) as iterator:
                 for dir_entry in iterator:
-                    entry_path = Path(dir_entry.path)
-                    if entry_path.resolve() in self._ignored_files:
+                    name = dir_entry.name
+                    if name in ignored_names:
                         continue
-                    if dir_entry.is_symlink() and not self.follow_symlinks:
+                    # is_symlink() 直接取自 readdir 返回的类型信息，不会产生额外的系统调用。
+                    is_symlink = dir_entry.is_symlink()
+                    if is_symlink and not follow_symlinks:
                         continue
                     try:
-                        stat_info = dir_entry.stat(follow_symlinks=self.follow_symlinks)
+                        if fast_stat is None:
+                            stat_info = dir_entry.stat(follow_symlinks=follow_symlinks)
+                            mode, size, mtime = stat_info.st_mode, stat_info.st_size, stat_info.st_mtime
+                        else:
+                            mode, size, mtime = fast_stat(dir_entry.path, follow_symlinks=follow_symlinks)
                     except (FileNotFoundError, PermissionError, OSError) as error:
                         LOGGER.warning("无法读取 %s 的元数据：%s", dir_entry.path, error)
                         continue
-                    is_directory = dir_entry.is_dir(follow_symlinks=self.follow_symlinks)
-                    relative_child = self._to_relative(Path(dir_entry.path))
-                    entry = IndexEntry(
-                        path=relative_child,
-                        parent=rel_path,
-                        is_dir=is_directory,
-                        size=None if is_directory else stat_info.st_size,
-                        mtime=stat_info.st_mtime,
-                    )
-                    entries.append(entry)
-                    if is_directory:
-                        directories.append((Path(dir_entry.path), relative_child))
+                    if is_symlink:
+                        # 只有跟随符号链接时才需要解析真实路径，以便识别指向根目录外部的链接。
+                        relative_child = self._to_relative(dir_entry.path)
+                    else:
+                        relative_child = child_prefix + name
+                    # 每个条目只调用一次 stat：类型、大小和修改时间都从同一份结果中读取。
+                    if is_dir_mode(mode):
+                        add_entry((relative_child, rel_path, 1, None, mtime))
+                        add_directory((dir_entry.path, relative_child))
+                    else:
+                        add_entry((relative_child, rel_path, 0, size, mtime))
         except (FileNotFoundError, PermissionError) as error:
             LOGGER.warning("无法访问 %s：%s", abs_path, error)
         return entries, directories
 
-    def _to_relative(self, path: Path) -> str:
-        try:
-            relative = path.resolve().relative_to(self.root_path)
-        except ValueError:
-            # 当路径超出根目录（例如符号链接指向外部）时，退回到绝对路径表示，以免丢失信息。
-            return path.resolve().as_posix()
-        if not relative.parts:
+    def _to_relative(self, path: str) -> str:
+        # 只解析一次真实路径，然后按缓存的根目录前缀裁剪，不再构造 Path 并调用 relative_to()。
+        real_path = os.path.realpath(path)
+        if real_path.startswith(self._root_prefix):
+            return real_path[len(self._root_prefix):].replace(os.sep, "/")
+        if real_path == str(self.root_path):
             return "."
-        return relative.as_posix()
-
-    def _rebuild_tags(self, *, min_tag_frequency: int) -> None:
-        directories: List[str]
-        with self._db_lock:
-            cur = self._conn.execute("SELECT path FROM entries WHERE is_dir = 1")
-            directories = [row[0] for row in cur.fetchall()]
-
-        token_map: Dict[str, Set[str]] = {}
-        for directory in directories:
-            if directory == ".":
-                continue
-            folder_name = Path(directory).name
-            tokens = self._tokenize(folder_name)
-            for token in tokens:
-                token_map.setdefault(token, set()).add(directory)
-
-        filtered = {token: paths for token, paths in token_map.items() if len(paths) >= min_tag_frequency}
-
-        with self._db_lock:
-            self._conn.execute("DELETE FROM entry_tags")
-            self._conn.execute("DELETE FROM tags")
-
-            if filtered:
-                ordered_tokens = sorted(filtered.keys())
-                tag_rows = [
-                    (token, self._format_tag_display(token))
-                    for token in ordered_tokens
-                ]
-                self._conn.executemany(
-                    "INSERT INTO tags(name, display_name) VALUES(?, ?)",
-                    tag_rows,
-                )
-
-                association_rows = [
-                    (directory, token)
-                    for token in ordered_tokens
-                    for directory in sorted(filtered[token])
-                ]
-                self._conn.executemany(
-                    "INSERT INTO entry_tags(entry_path, tag_name) VALUES(?, ?)",
-                    association_rows,
-                )
-
-            self._conn.commit()
-
-    def _tokenize(self, name: str) -> Set[str]:
-        tokens = {match.group(0).lower() for match in re.finditer(r"[0-9A-Za-z]+", name)}
-        return {token for token in tokens if len(token) >= 2}
+        # 当路径超出根目录（例如符号链接指向外部）时，退回到绝对路径表示，以免丢失信息。
+        return Path(real_path).as_posix()
+
+    def _store_min_tag_frequency(self, conn: sqlite3.Connection, *, min_tag_frequency: int) -> None:
+        # entry_tags 已由触发器保持最新，增量构建只需记录 tags 视图使用的阈值。
+        conn.execute(
+            "INSERT OR REPLACE INTO settings(key, value) VALUES('min_tag_frequency', ?)",
+            (min_tag_frequency,),
+        )
 
-    def _format_tag_display(self, token: str) -> str:
-        if token.isalpha():
-            return token.capitalize()
-        return token
+    def _folder_tokens(self, path: str) -> str:
+        return _folder_name_tokens(path.rpartition("/")[2])
 
 
 def build_arg_parser() -> argparse.ArgumentParser:
@@ -448,23 +573,28 @@ def build_arg_parser() -> argparse.ArgumentParser:
         "--workers",
         type=int,
         default=None,
-        help="工作线程数量（默认使用逻辑 CPU 数量）",
+        help=f"工作线程数量（默认取逻辑 CPU 数量与 {_DEFAULT_IO_DEPTH} 中的较大值）",
     )
     parser.add_argument(
         "--follow-symlinks",
         action="store_true",
         help="在索引过程中跟随符号链接",
     )
+    parser.add_argument(
+        "--fast-stat",
+        action="store_true",
+        help="在 Linux 上使用 statx(AT_STATX_DONT_SYNC) 读取元数据，适合 NFS/SMB 等远程文件系统",
+    )
     parser.add_argument(
         "--batch-size",
         type=int,
-        default=512,
+        default=8192,
         help="写入磁盘前缓冲的条目数量",
     )
     parser.add_argument(
         "--min-tag-frequency",
         type=int,
-        default=2,
+        default=_DEFAULT_MIN_TAG_FREQUENCY,
         help="某个关键词至少需要匹配多少个目录后才会升级为标签",
     )
     parser.add_argument(
@@ -482,7 +612,12 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
 
     logging.basicConfig(level=getattr(logging, args.log_level))
 
-    with DirectoryIndexer(args.root, args.database, follow_symlinks=args.follow_symlinks) as indexer:
+    with DirectoryIndexer(
+        args.root,
+        args.database,
+        follow_symlinks=args.follow_symlinks,
+        fast_stat=args.fast_stat,
+    ) as indexer:
         indexer.build_index(
             max_workers=args.workers,
             batch_size=args.batch_size,
@@ -1,112 +1,286 @@
 """应用菜单栏的中文化定义。
 
-该模块提供 :func:`build_default_menu`，用于生成 ImageViewer 前端默认
-菜单的数据结构。菜单条目的标签、命令和快捷键均以中文呈现，便于提
-供一致的本地化体验。"""
+该模块提供 :func:`build_default_menu` 与 :func:`build_default_menu_dict`，
+用于生成 ImageViewer 前端默认菜单的数据结构。菜单条目的标签、命令和
+快捷键均以中文呈现，便于提供一致的本地化体验。"""
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+import json
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, ClassVar, Deque, Dict, Iterable, List, Mapping, Optional, Tuple, TypeVar
 
+try:  # 可选依赖：安装后使用 C 实现的 JSON 编码器
+    import msgspec
+except ImportError:
+    msgspec = None
 
-@dataclass(slots=True)
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True, slots=True)
 class MenuItem:
-    """表示菜单栏中的单个条目。"""
+    """表示菜单栏中的单个条目。
+
+    条目不可变且可哈希，相同的条目可以安全地在多处、多线程间共享。
+    """
 
     label: str = ""
     command: Optional[str] = None
     role: Optional[str] = None
     accelerator: Optional[str] = None
-    submenu: List["MenuItem"] = field(default_factory=list)
+    submenu: Tuple["MenuItem", ...] = ()
     enabled: bool = True
     is_separator: bool = False
 
+    # 序列化时按顺序输出的标量字段，值为空时省略：``(属性名, 输出键)``。
+    _DICT_FIELDS: ClassVar[Tuple[Tuple[str, str], ...]] = (
+        ("label", "label"),
+        ("command", "command"),
+        ("role", "role"),
+        ("accelerator", "accelerator"),
+    )
+
     @classmethod
     def separator(cls) -> "MenuItem":
-        """创建一个分隔符条目。"""
+        """返回共享的分隔符条目。"""
 
-        return cls(label="", is_separator=True)
+        return _SEPARATOR_SINGLETON
 
     def to_dict(self) -> Dict[str, object]:
-        """将菜单项转换为前端可直接消费的字典结构。"""
-
-        if self.is_separator:
-            return {"type": "separator"}
-
-        data: Dict[str, object] = {"label": self.label}
-        if self.command:
-            data["command"] = self.command
-        if self.role:
-            data["role"] = self.role
-        if self.accelerator:
-            data["accelerator"] = self.accelerator
-        if self.submenu:
-            data["submenu"] = [child.to_dict() for child in self.submenu]
-        if not self.enabled:
-            data["enabled"] = False
-        return data
-
-
-def build_default_menu() -> List[MenuItem]:
-    """返回带有中文标签的默认菜单栏配置。"""
-
-    file_menu = MenuItem(
-        label="文件",
-        submenu=[
-            MenuItem(label="打开目录…", command="open-directory", accelerator="Ctrl+O"),
-            MenuItem(label="刷新索引", command="refresh-index", accelerator="Ctrl+R"),
-            MenuItem.separator(),
-            MenuItem(label="导出标签…", command="export-tags", accelerator="Ctrl+E"),
-            MenuItem.separator(),
-            MenuItem(label="退出", role="quit"),
-        ],
-    )
+        """将菜单项转换为前端可直接消费的字典结构。
 
-    edit_menu = MenuItem(
-        label="编辑",
-        submenu=[
-            MenuItem(label="撤销", role="undo", accelerator="Ctrl+Z"),
-            MenuItem(label="重做", role="redo", accelerator="Ctrl+Shift+Z"),
-            MenuItem.separator(),
-            MenuItem(label="剪切", role="cut", accelerator="Ctrl+X"),
-            MenuItem(label="复制", role="copy", accelerator="Ctrl+C"),
-            MenuItem(label="粘贴", role="paste", accelerator="Ctrl+V"),
-            MenuItem(label="全选", role="selectAll", accelerator="Ctrl+A"),
-        ],
-    )
+        使用显式栈遍历整棵子树，避免逐层递归调用；子菜单列表预先分配，子节点按下标回填。分隔符返回共享的只读映射，
+        序列化为 JSON 时需配合 ``default=dict``。
+        """
 
-    view_menu = MenuItem(
-        label="视图",
-        submenu=[
-            MenuItem(label="缩略图视图", command="show-thumbnails", accelerator="Ctrl+1"),
-            MenuItem(label="列表视图", command="show-list", accelerator="Ctrl+2"),
-            MenuItem.separator(),
-            MenuItem(label="显示标签面板", command="toggle-tag-panel", accelerator="Ctrl+T"),
-            MenuItem(label="重新加载", role="reload", accelerator="Ctrl+R"),
-            MenuItem(label="切换全屏", role="togglefullscreen", accelerator="F11"),
-        ],
-    )
+        fields = self._DICT_FIELDS
+        result: List[Optional[Dict[str, object]]] = [None]
+        stack: Deque[Tuple[MenuItem, List[Optional[Dict[str, object]]], int]] = deque(((self, result, 0),))
+        while stack:
+            item, slots, index = stack.pop()
+            if item.is_separator:
+                slots[index] = _SEPARATOR_DICT
+                continue
 
-    window_menu = MenuItem(
-        label="窗口",
-        submenu=[
-            MenuItem(label="最小化", role="minimize"),
-            MenuItem(label="关闭窗口", role="close"),
-        ],
-    )
+            submenu = item.submenu
+            if item.label and item.enabled and not submenu:
+                # 常见的叶子条目：按非空字段组合选择预置构造器，一次生成大小确定的字典字面量。
+                mask = (1 if item.command else 0) | (2 if item.role else 0) | (4 if item.accelerator else 0)
+                slots[index] = _LEAF_BUILDERS[mask](item)
+                continue
 
-    help_menu = MenuItem(
-        label="帮助",
-        submenu=[
-            MenuItem(label="查看使用手册", command="open-manual"),
-            MenuItem(label="提交反馈", command="open-feedback"),
-            MenuItem.separator(),
-            MenuItem(label="关于 ImageViewer", command="open-about"),
-        ],
-    )
+            data: Dict[str, object] = {}
+            for attr, key in fields:
+                value = getattr(item, attr)
+                if value:
+                    data[key] = value
+            if submenu:
+                children: List[Optional[Dict[str, object]]] = [None] * len(submenu)
+                data["submenu"] = children
+                stack.extend((child, children, position) for position, child in enumerate(submenu))
+            if not item.enabled:
+                data["enabled"] = False
+            slots[index] = data
+        return result[0]
+
+
+# 带标签、已启用且没有子菜单的叶子条目的构造器，下标为 command(1)|role(2)|accelerator(4) 的非空掩码。
+_LEAF_BUILDERS: Tuple[Callable[[MenuItem], Dict[str, object]], ...] = (
+    lambda item: {"label": item.label},
+    lambda item: {"label": item.label, "command": item.command},
+    lambda item: {"label": item.label, "role": item.role},
+    lambda item: {"label": item.label, "command": item.command, "role": item.role},
+    lambda item: {"label": item.label, "accelerator": item.accelerator},
+    lambda item: {"label": item.label, "command": item.command, "accelerator": item.accelerator},
+    lambda item: {"label": item.label, "role": item.role, "accelerator": item.accelerator},
+    lambda item: {
+        "label": item.label,
+        "command": item.command,
+        "role": item.role,
+        "accelerator": item.accelerator,
+    },
+)
+
+# 分隔符没有任何可变状态，所有位置共享同一个条目与同一份序列化结果。
+_SEPARATOR_DICT: Mapping[str, object] = MappingProxyType({"type": "separator"})
+_SEPARATOR_SINGLETON = MenuItem(is_separator=True)
+
+
+@dataclass(frozen=True, slots=True)
+class _Role:
+    """菜单规格中的系统角色标记，用于与普通命令区分。"""
+
+    name: str
+
+
+# 默认菜单的纯数据规格：``(标签, 子菜单规格)`` 为顶层菜单，``(标签, 命令或 _Role[, 快捷键])`` 为叶子条目，
+# ``None`` 为分隔符。
+_SPEC = (
+    (
+        "文件",
+        (
+            ("打开目录…", "open-directory", "Ctrl+O"),
+            ("刷新索引", "refresh-index", "Ctrl+R"),
+            None,
+            ("导出标签…", "export-tags", "Ctrl+E"),
+            None,
+            ("退出", _Role("quit")),
+        ),
+    ),
+    (
+        "编辑",
+        (
+            ("撤销", _Role("undo"), "Ctrl+Z"),
+            ("重做", _Role("redo"), "Ctrl+Shift+Z"),
+            None,
+            ("剪切", _Role("cut"), "Ctrl+X"),
+            ("复制", _Role("copy"), "Ctrl+C"),
+            ("粘贴", _Role("paste"), "Ctrl+V"),
+            ("全选", _Role("selectAll"), "Ctrl+A"),
+        ),
+    ),
+    (
+        "视图",
+        (
+            ("缩略图视图", "show-thumbnails", "Ctrl+1"),
+            ("列表视图", "show-list", "Ctrl+2"),
+            None,
+            ("显示标签面板", "toggle-tag-panel", "Ctrl+T"),
+            ("重新加载", _Role("reload"), "Ctrl+R"),
+            ("切换全屏", _Role("togglefullscreen"), "F11"),
+        ),
+    ),
+    (
+        "窗口",
+        (
+            ("最小化", _Role("minimize")),
+            ("关闭窗口", _Role("close")),
+        ),
+    ),
+    (
+        "帮助",
+        (
+            ("查看使用手册", "open-manual"),
+            ("提交反馈", "open-feedback"),
+            None,
+            ("关于 ImageViewer", "open-about"),
+        ),
+    ),
+)
+
+
+def _build(spec: Optional[tuple], make_item: Callable[..., _T], separator: _T) -> _T:
+    """按规格递归构建条目，``make_item`` 接收 ``(label, command, role, accelerator, submenu)``。"""
+
+    if spec is None:
+        return separator
+    label, action, *rest = spec
+    if isinstance(action, tuple):
+        submenu = tuple(_build(child, make_item, separator) for child in action)
+        return make_item(label, None, None, None, submenu)
+    accelerator = rest[0] if rest else None
+    if isinstance(action, _Role):
+        return make_item(label, None, action.name, accelerator, ())
+    return make_item(label, action, None, accelerator, ())
+
+
+def _entry(
+    label: str,
+    command: Optional[str],
+    role: Optional[str],
+    accelerator: Optional[str],
+    submenu: Tuple[Mapping[str, object], ...],
+) -> Mapping[str, object]:
+    fields = {"label": label, "command": command, "role": role, "accelerator": accelerator, "submenu": submenu}
+    return MappingProxyType({key: value for key, value in fields.items() if value})
+
+
+# 由规格生成的只读字典结构，与 :meth:`MenuItem.to_dict` 的输出结构一致。
+_DEFAULT_MENU: Tuple[Mapping[str, object], ...] = tuple(_build(spec, _entry, _SEPARATOR_DICT) for spec in _SPEC)
+
+DEFAULT_MENU_DICT = _DEFAULT_MENU
+
+
+
+def _msgspec_enc_hook(obj: object) -> object:
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise NotImplementedError(f"Objects of type {type(obj).__name__} are not supported")
+
+
+def _encode_json(data: object) -> bytes:
+    if msgspec is not None:
+        return msgspec.json.encode(data, enc_hook=_msgspec_enc_hook)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=dict).encode("utf-8")
+
+
+def encode_menu(items: Iterable[MenuItem]) -> bytes:
+    """将菜单条目编码为紧凑的 UTF-8 JSON，安装了 ``msgspec`` 时使用其编码器。"""
+
+    return _encode_json([item.to_dict() for item in items])
+
+
+# 预先编码好的默认菜单 JSON（UTF-8），前端请求菜单时可直接写出这段字节。
+DEFAULT_MENU_JSON: bytes = _encode_json(_DEFAULT_MENU)
+
+
+def build_default_menu_dict() -> Tuple[Mapping[str, object], ...]:
+    """返回默认菜单的只读字典结构，可直接序列化后发送给前端。"""
+
+    return _DEFAULT_MENU
+
+
+@lru_cache(maxsize=None)
+def _menu_item(
+    label: str = "",
+    command: Optional[str] = None,
+    role: Optional[str] = None,
+    accelerator: Optional[str] = None,
+    submenu: Tuple[MenuItem, ...] = (),
+    enabled: bool = True,
+) -> MenuItem:
+    # 相同的条目只保留一个实例。
+    return MenuItem(label, command, role, accelerator, submenu, enabled)
+
+
+_SPEC_BY_LABEL = {spec[0]: spec for spec in _SPEC}
+
+# 顶层菜单标签，按菜单栏中的显示顺序排列；无需构建菜单树即可读取。
+DEFAULT_TOP_LEVEL_LABELS: Tuple[str, ...] = tuple(_SPEC_BY_LABEL)
+
+
+@lru_cache(maxsize=None)
+def build_top_level_menu(label: str) -> MenuItem:
+    """只构建标签为 ``label`` 的顶层菜单及其子条目，适用于前端一次只展示一个菜单的场景。
+
+    未知标签抛出 :class:`KeyError`。
+    """
+
+    return _build(_SPEC_BY_LABEL[label], _menu_item, _SEPARATOR_SINGLETON)
+
+
+@lru_cache(maxsize=1)
+def build_default_menu() -> Tuple[MenuItem, ...]:
+    """返回带有中文标签的默认菜单栏配置。
+
+    条目按菜单规格生成，首次调用时构建一次并在后续调用间共享。只需要序列化结果时请使用
+    :func:`build_default_menu_dict`。
+    """
 
-    return [file_menu, edit_menu, view_menu, window_menu, help_menu]
+    return tuple(build_top_level_menu(label) for label in DEFAULT_TOP_LEVEL_LABELS)
 
 
-__all__ = ["MenuItem", "build_default_menu"]
+__all__ = [
+    "DEFAULT_MENU_DICT",
+    "DEFAULT_MENU_JSON",
+    "DEFAULT_TOP_LEVEL_LABELS",
+    "MenuItem",
+    "build_default_menu",
+    "build_default_menu_dict",
+    "build_top_level_menu",
+    "encode_menu",
+]
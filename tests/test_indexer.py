@@ -1,7 +1,8 @@
 import os
+import shutil
 import sqlite3
-import time
 from pathlib import Path
+from typing import Tuple
 
 import pytest
 
@@ -13,51 +14,63 @@ def create_file(path: Path, content: str = "data") -> None:
     path.write_text(content)
 
 
-def test_initial_index_build(tmp_path: Path) -> None:
-    create_file(tmp_path / "season1" / "episode1.mp4")
-    create_file(tmp_path / "season1" / "episode2.mp4")
-    create_file(tmp_path / "season2" / "episode1.mp4")
+@pytest.fixture(scope="module")
+def indexed_tree(tmp_path_factory: pytest.TempPathFactory) -> Tuple[Path, Path]:
+    root = tmp_path_factory.mktemp("indexed_tree")
+    create_file(root / "season1" / "episode1.mp4")
+    create_file(root / "season1" / "episode2.mp4")
+    create_file(root / "season2" / "episode1.mp4")
 
-    index_path = tmp_path / "index.db"
-    with DirectoryIndexer(tmp_path, index_path) as indexer:
+    index_path = root / "index.db"
+    with DirectoryIndexer(root, index_path) as indexer:
         indexer.build_index(max_workers=2, batch_size=10)
+    return root, index_path
+
+
+def test_initial_index_build(indexed_tree: Tuple[Path, Path]) -> None:
+    root, index_path = indexed_tree
+    with DirectoryIndexer(root, index_path) as indexer:
         root_entries = indexer.list_directory(".")
 
     names = sorted(entry.path for entry in root_entries)
     assert names == ["season1", "season2"]
 
-    with sqlite3.connect(index_path) as conn:
+    # read-only URI connection: no write lock or journal setup needed for the count
+    with sqlite3.connect(f"{index_path.as_uri()}?mode=ro", uri=True) as conn:
         count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
     # 1 root + 2 folders + 3 files = 6 entries
     assert count == 6
 
 
-def test_incremental_updates(tmp_path: Path) -> None:
-    season1 = tmp_path / "season1"
+def test_incremental_updates(indexed_tree: Tuple[Path, Path], tmp_path: Path) -> None:
+    # copy the pre-built tree and index so mutations stay local to this test
+    root = Path(shutil.copytree(indexed_tree[0], tmp_path / "library"))
+    season1 = root / "season1"
     episode1 = season1 / "episode1.mp4"
-    create_file(episode1, "one")
 
-    index_path = tmp_path / "index.db"
-    with DirectoryIndexer(tmp_path, index_path) as indexer:
-        indexer.build_index(max_workers=2, batch_size=4)
-
-        time.sleep(1.1)  # ensure mtime resolution differences do not hide updates
+    index_path = root / indexed_tree[1].name
+    with DirectoryIndexer(root, index_path) as indexer:
+        original_mtime = episode1.stat().st_mtime
         episode1.write_text("updated")
-        create_file(season1 / "episode2.mp4", "two")
-        (tmp_path / "orphan.txt").write_text("orphan")
+        # bump the mtime explicitly so filesystem timestamp resolution cannot hide the update
+        os.utime(episode1, (original_mtime + 2, original_mtime + 2))
+        create_file(season1 / "episode3.mp4", "three")
+        (root / "orphan.txt").write_text("orphan")
         indexer.build_index(max_workers=2, batch_size=4)
 
         entries = {entry.path for entry in indexer.iter_all()}
+        sizes = {entry.path: entry.size for entry in indexer.list_directory("season1")}
 
-    assert "." in entries
-    assert "season1" in entries
-    assert "season1/episode1.mp4" in entries
-    assert "season1/episode2.mp4" in entries
-    assert "orphan.txt" in entries
-    # ensure deleted entries disappear
-    (tmp_path / "orphan.txt").unlink()
+        assert sizes["season1/episode1.mp4"] == len("updated")
+        assert "." in entries
+        assert "season1" in entries
+        assert "season1/episode1.mp4" in entries
+        assert "season1/episode2.mp4" in entries
+        assert "season1/episode3.mp4" in entries
+        assert "orphan.txt" in entries
+        # ensure deleted entries disappear
+        (root / "orphan.txt").unlink()
 
-    with DirectoryIndexer(tmp_path, index_path) as indexer:
         indexer.build_index(max_workers=2, batch_size=4)
         entries_after_delete = {entry.path for entry in indexer.iter_all()}
 
@@ -87,3 +100,197 @@ def test_directory_tags_generated_from_names(tmp_path: Path) -> None:
         "Beach 2021",
         "Beach Sunset",
     }
+
+
+def test_database_files_inside_root_are_ignored(tmp_path: Path) -> None:
+    create_file(tmp_path / "photo.jpg")
+    index_path = tmp_path / "index.db"
+    create_file(tmp_path / "index.db-wal", "")
+    create_file(tmp_path / "index.db-shm", "")
+
+    with DirectoryIndexer(tmp_path, index_path) as indexer:
+        indexer.build_index(max_workers=2, batch_size=4)
+        entries = {entry.path for entry in indexer.iter_all()}
+
+    assert entries == {".", "photo.jpg"}
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="需要符号链接支持")
+def test_followed_symlinks_use_resolved_paths(tmp_path: Path) -> None:
+    root = tmp_path / "library"
+    outside = tmp_path / "outside"
+    create_file(root / "real" / "photo.jpg")
+    create_file(outside / "extra.jpg")
+    try:
+        os.symlink(root / "real", root / "alias", target_is_directory=True)
+        os.symlink(outside, root / "external", target_is_directory=True)
+    except OSError:
+        pytest.skip("当前环境无法创建符号链接")
+
+    with DirectoryIndexer(root, tmp_path / "index.db", follow_symlinks=True) as indexer:
+        indexer.build_index(max_workers=2, batch_size=4)
+        entries = {entry.path: entry.parent for entry in indexer.iter_all()}
+
+    external = outside.resolve().as_posix()
+    assert "alias" not in entries
+    assert entries["real"] == "."
+    assert entries["real/photo.jpg"] == "real"
+    assert entries[external] == "."
+    assert entries[f"{external}/extra.jpg"] == external
+
+
+def test_failed_build_keeps_previous_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    create_file(tmp_path / "a" / "x.jpg")
+    create_file(tmp_path / "b.jpg")
+
+    index_path = tmp_path / "index.db"
+    with DirectoryIndexer(tmp_path, index_path) as indexer:
+        indexer.build_index(max_workers=2, batch_size=4)
+        before = [entry.path for entry in indexer.iter_all()]
+
+        (tmp_path / "b.jpg").unlink()
+        create_file(tmp_path / "c.jpg")
+        original_stage = DirectoryIndexer._stage_entries
+        calls = []
+
+        def failing_stage(self, *args, **kwargs):
+            calls.append(args)
+            if len(calls) > 1:
+                raise RuntimeError("disk full")
+            return original_stage(self, *args, **kwargs)
+
+        monkeypatch.setattr(DirectoryIndexer, "_stage_entries", failing_stage)
+        with pytest.raises(RuntimeError, match="disk full"):
+            indexer.build_index(max_workers=2, batch_size=4)
+        monkeypatch.undo()
+
+        # 已删除的 b.jpg 仍然存在，说明过期条目的删除也随失败的构建一起回滚。
+        assert [entry.path for entry in indexer.iter_all()] == before
+
+
+def test_build_commits_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    for album in range(4):
+        for number in range(20):
+            create_file(tmp_path / f"album{album}" / f"photo{number}.jpg")
+
+    index_path = tmp_path / "index.db"
+    with DirectoryIndexer(tmp_path, index_path) as indexer:
+        observer = sqlite3.connect(index_path, check_same_thread=False)
+        original_stage = DirectoryIndexer._stage_entries
+        visible_counts = []
+
+        def observed_stage(self, *args, **kwargs):
+            original_stage(self, *args, **kwargs)
+            visible_counts.append(observer.execute("SELECT COUNT(*) FROM entries").fetchone()[0])
+
+        monkeypatch.setattr(DirectoryIndexer, "_stage_entries", observed_stage)
+        indexer.build_index(max_workers=2, batch_size=32)
+        final_count = observer.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        observer.close()
+
+    # 构建过程中其他连接看不到任何中间批次，只有最终提交后才可见。
+    assert len(visible_counts) > 2
+    assert set(visible_counts) == {0}
+    assert final_count == 85
+
+
+def test_failed_tag_update_rolls_back_entries(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    create_file(tmp_path / "Beach 2020" / "photo1.jpg")
+    create_file(tmp_path / "Beach 2021" / "photo2.jpg")
+
+    index_path = tmp_path / "index.db"
+    with DirectoryIndexer(tmp_path, index_path) as indexer:
+        indexer.build_index(max_workers=2, batch_size=4)
+        before = [entry.path for entry in indexer.iter_all()]
+
+        create_file(tmp_path / "Beach 2022" / "photo3.jpg")
+
+        def failing_update(self, *args, **kwargs):
+            raise RuntimeError("tag update failed")
+
+        monkeypatch.setattr(DirectoryIndexer, "_store_min_tag_frequency", failing_update)
+        with pytest.raises(RuntimeError, match="tag update failed"):
+            indexer.build_index(max_workers=2, batch_size=4)
+
+        assert [entry.path for entry in indexer.iter_all()] == before
+        assert {tag.name: tag.match_count for tag in indexer.list_tags()}["beach"] == 2
+
+
+def test_scan_failure_aborts_build(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    create_file(tmp_path / "a" / "x.jpg")
+
+    index_path = tmp_path / "index.db"
+    with DirectoryIndexer(tmp_path, index_path) as indexer:
+        indexer.build_index(max_workers=2, batch_size=4)
+        before = [entry.path for entry in indexer.iter_all()]
+
+        def failing_scan(self, *args, **kwargs):
+            raise RuntimeError("scan failed")
+
+        monkeypatch.setattr(DirectoryIndexer, "_scan_directory", failing_scan)
+        with pytest.raises(RuntimeError, match="scan failed"):
+            indexer.build_index(max_workers=2, batch_size=4)
+
+        assert [entry.path for entry in indexer.iter_all()] == before
+
+
+def test_fast_stat_build_matches_default(tmp_path: Path) -> None:
+    root = tmp_path / "library"
+    create_file(root / "season1" / "episode1.mp4", "one")
+    create_file(root / "season2" / "episode1.mp4", "longer")
+
+    results = []
+    for fast_stat in (False, True):
+        with DirectoryIndexer(root, tmp_path / f"index-{fast_stat}.db", fast_stat=fast_stat) as indexer:
+            indexer.build_index(max_workers=2, batch_size=4)
+            results.append(sorted((e.path, e.parent, e.is_dir, e.size, e.mtime) for e in indexer.iter_all()))
+
+    assert results[0] == results[1]
+
+
+def test_legacy_schema_is_rebuilt(tmp_path: Path) -> None:
+    root = tmp_path / "library"
+    create_file(root / "season1" / "episode1.mp4")
+    index_path = tmp_path / "index.db"
+    with sqlite3.connect(index_path) as conn:
+        conn.execute(
+            "CREATE TABLE entries (path TEXT PRIMARY KEY, parent TEXT, is_dir INTEGER NOT NULL, "
+            "size INTEGER, mtime REAL NOT NULL, seen INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.execute("INSERT INTO entries VALUES ('stale', '.', 0, 1, 0, 1)")
+    conn.close()
+
+    with DirectoryIndexer(root, index_path) as indexer:
+        indexer.build_index(max_workers=2, batch_size=4)
+        entries = {entry.path for entry in indexer.iter_all()}
+
+    assert entries == {".", "season1", "season1/episode1.mp4"}
+
+
+def test_tags_follow_incremental_changes(tmp_path: Path) -> None:
+    root = tmp_path / "library"
+    create_file(root / "Beach 2020" / "photo1.jpg")
+    create_file(root / "Beach 2021" / "photo2.jpg")
+    create_file(root / "Trip 2021" / "photo3.jpg")
+
+    with DirectoryIndexer(root, tmp_path / "index.db") as indexer:
+        indexer.build_index(max_workers=2, batch_size=4)
+        assert {tag.name: tag.display_name for tag in indexer.list_tags()} == {
+            "beach": "Beach",
+            "2021": "2021",
+        }
+
+        for child in (root / "Beach 2021").iterdir():
+            child.unlink()
+        (root / "Beach 2021").rmdir()
+        (root / "Trip 2020").write_text("a file, not a folder")
+        indexer.build_index(max_workers=2, batch_size=4)
+        assert indexer.list_tags() == []
+        assert indexer.list_directories_by_tag("beach") == []
+
+        (root / "Trip 2020").unlink()
+        create_file(root / "Trip 2020" / "photo4.jpg")
+        indexer.build_index(max_workers=2, batch_size=4, min_tag_frequency=2)
+        tag_counts = {tag.name: tag.match_count for tag in indexer.list_tags()}
+
+    assert tag_counts == {"2020": 2, "trip": 2}
@@ -1,10 +1,33 @@
-from image_viewer.menu import MenuItem, build_default_menu
+import dataclasses
+import json
+
+import pytest
+
+from image_viewer.menu import (
+    DEFAULT_MENU_DICT,
+    DEFAULT_MENU_JSON,
+    DEFAULT_TOP_LEVEL_LABELS,
+    MenuItem,
+    build_default_menu,
+    build_default_menu_dict,
+    build_top_level_menu,
+    encode_menu,
+)
 
 
 def test_default_menu_labels_are_chinese() -> None:
+    assert DEFAULT_TOP_LEVEL_LABELS == ("文件", "编辑", "视图", "窗口", "帮助")
+
+
+def test_default_menu_matches_top_level_labels() -> None:
+    assert tuple(item.label for item in build_default_menu()) == DEFAULT_TOP_LEVEL_LABELS
+
+
+def test_default_menu_is_built_once() -> None:
     top_level = build_default_menu()
-    labels = [item.label for item in top_level]
-    assert labels == ["文件", "编辑", "视图", "窗口", "帮助"]
+    assert isinstance(top_level, tuple)
+    assert build_default_menu() is top_level
+    assert all(isinstance(item.submenu, tuple) for item in top_level)
 
 
 def test_menu_item_to_dict_structure() -> None:
@@ -17,5 +40,80 @@ def test_menu_item_to_dict_structure() -> None:
     }
 
 
+def test_menu_item_to_dict_omits_empty_fields() -> None:
+    item = MenuItem(role="quit", enabled=False)
+    assert item.to_dict() == {"role": "quit", "enabled": False}
+
+
 def test_separator_serialization() -> None:
     assert MenuItem.separator().to_dict() == {"type": "separator"}
+    assert MenuItem.separator() is MenuItem.separator()
+    assert MenuItem.separator().to_dict() is MenuItem.separator().to_dict()
+
+
+def test_default_menu_dict_matches_tree() -> None:
+    assert build_default_menu_dict() is DEFAULT_MENU_DICT
+    expected = [item.to_dict() for item in build_default_menu()]
+    assert json.loads(json.dumps(DEFAULT_MENU_DICT, default=dict)) == expected
+
+
+def test_default_menu_json_is_compact_utf8() -> None:
+    expected = [item.to_dict() for item in build_default_menu()]
+    assert json.loads(DEFAULT_MENU_JSON.decode("utf-8")) == expected
+    assert "文件".encode("utf-8") in DEFAULT_MENU_JSON
+    assert b": " not in DEFAULT_MENU_JSON
+    assert encode_menu(build_default_menu()) == DEFAULT_MENU_JSON
+
+
+def test_menu_item_equality_and_repr() -> None:
+    item = MenuItem("退出", role="quit")
+    assert item == MenuItem(label="退出", role="quit")
+    assert item != MenuItem(label="退出", role="close")
+    assert repr(item).startswith("MenuItem(label='退出', command=None, role='quit'")
+
+
+def test_nested_to_dict_preserves_order() -> None:
+    item = MenuItem(
+        "视图",
+        submenu=(
+            MenuItem("子菜单", submenu=(MenuItem("甲", command="a"), MenuItem.separator()), enabled=False),
+            MenuItem("乙", command="b"),
+        ),
+    )
+    assert item.to_dict() == {
+        "label": "视图",
+        "submenu": [
+            {"label": "子菜单", "submenu": [{"label": "甲", "command": "a"}, {"type": "separator"}], "enabled": False},
+            {"label": "乙", "command": "b"},
+        ],
+    }
+
+
+def test_leaf_to_dict_covers_every_field_combination() -> None:
+    for command in (None, "open"):
+        for role in (None, "quit"):
+            for accelerator in (None, "Ctrl+Q"):
+                item = MenuItem("退出", command=command, role=role, accelerator=accelerator)
+                expected = {"label": "退出", "command": command, "role": role, "accelerator": accelerator}
+                expected = {key: value for key, value in expected.items() if value}
+                data = item.to_dict()
+                assert data == expected
+                assert list(data) == list(expected)
+
+
+def test_menu_items_are_frozen_and_hashable() -> None:
+    item = MenuItem("退出", role="quit")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        item.label = "关闭"  # type: ignore[misc]
+    assert {item, MenuItem("退出", role="quit")} == {item}
+
+    separators = {child for top in build_default_menu() for child in top.submenu if child.is_separator}
+    assert separators == {MenuItem.separator()}
+
+
+def test_top_level_menu_is_built_on_demand() -> None:
+    window_menu = build_top_level_menu("窗口")
+    assert [child.label for child in window_menu.submenu] == ["最小化", "关闭窗口"]
+    assert build_default_menu()[3] is window_menu
+    with pytest.raises(KeyError):
+        build_top_level_menu("不存在")
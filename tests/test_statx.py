@@ -0,0 +1,28 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from image_viewer import _statx
+
+pytestmark = pytest.mark.skipif(not _statx.is_available(), reason="需要 Linux statx 支持")
+
+
+def test_fast_stat_matches_lstat(tmp_path: Path) -> None:
+    target = tmp_path / "photo.jpg"
+    target.write_text("data")
+    link = tmp_path / "link.jpg"
+    os.symlink(target, link)
+
+    for path in (target, tmp_path, link):
+        expected = os.lstat(path)
+        assert _statx.fast_stat(str(path), follow_symlinks=False) == (
+            expected.st_mode,
+            expected.st_size,
+            expected.st_mtime,
+        )
+    followed = os.stat(link)
+    assert _statx.fast_stat(str(link), follow_symlinks=True)[1] == followed.st_size
+
+    with pytest.raises(FileNotFoundError):
+        _statx.fast_stat(str(tmp_path / "missing"), follow_symlinks=False)